@@ -0,0 +1,100 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SolutionCache:
+    """
+    LRU-Cache für FEM-Lösungen, geschlüsselt über die Topologie.
+
+    Der Schlüssel ist ein Hash aus aktiver Maske, Randbedingungen, Lastvektor und Geometrie
+    (Koordinaten, Elementverbindungen, Elementsteifigkeiten). Gespeichert werden Verschiebungen u
+    und Knotenenergien.
+    Verdrängt wird nach Speicherbedarf (max_bytes), der älteste Eintrag zuerst.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key_for(structure) -> str:
+        aktiv = structure.hole_aktiv_maske()
+        fixiert = np.array([node.fixed for node in structure.nodes], dtype=bool)
+        koords = np.array([node.coords for node in structure.nodes], dtype=np.float64)
+        a, b = structure.hole_verbindungsarrays()
+        steifigkeiten = np.fromiter((el.k for el in structure.elements), dtype=np.float64,
+                                    count=len(structure.elements))
+
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (aktiv, fixiert, structure.erstelle_kraftvektor(), koords, a, b, steifigkeiten):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        """Liefert (u, energien) oder None. Zählt Treffer/Fehlschläge mit."""
+        eintrag = self._entries.get(key)
+        if eintrag is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        u, energie_werte = eintrag
+        return u.copy(), dict(enumerate(energie_werte.tolist()))
+
+    def put(self, key, u: np.ndarray, energien: dict):
+        energie_werte = np.array([energien[nid] for nid in range(len(energien))], dtype=np.float64)
+        u = np.array(u, dtype=np.float64)
+        groesse = u.nbytes + energie_werte.nbytes
+
+        if key in self._entries:
+            alt_u, alt_e = self._entries.pop(key)
+            self.current_bytes -= alt_u.nbytes + alt_e.nbytes
+
+        if groesse > self.max_bytes:
+            return
+
+        while self._entries and self.current_bytes + groesse > self.max_bytes:
+            _, (alt_u, alt_e) = self._entries.popitem(last=False)
+            self.current_bytes -= alt_u.nbytes + alt_e.nbytes
+            self.evictions += 1
+
+        self._entries[key] = (u, energie_werte)
+        self.current_bytes += groesse
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"SolutionCache(eintraege={len(self)}, bytes={self.current_bytes}, "
+                f"hits={self.hits}, misses={self.misses}, evictions={self.evictions})")
+
+
+def solve_cached(structure, cache: SolutionCache):
+    """
+    Wie structure.loese_system() + berechne_knoten_energien(u), aber über den Cache.
+    Bei einem Treffer werden die Verschiebungen trotzdem in die Knoten geschrieben.
+    """
+    key = cache.key_for(structure)
+    treffer = cache.get(key)
+    if treffer is not None:
+        u, energien = treffer
+        structure.speichere_verschiebungen(u)
+        return u, energien
+
+    u = structure.loese_system()
+    if u is None:
+        return None, None
+    energien = structure.berechne_knoten_energien(u)
+    cache.put(key, u, energien)
+    return u, energien
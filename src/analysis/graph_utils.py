@@ -1,9 +1,86 @@
+import numpy as np
 from ..model.structure import Structure
 
+
+def label_components(structure: Structure):
+    """
+    Bestimmt die Zusammenhangskomponenten des aktiven Teilgraphen (vektorisiert).
+
+    Minimum-Label-Propagation über die Elementarrays mit Pointer-Jumping:
+    Jeder Knoten startet mit seiner eigenen ID, pro Durchlauf übernehmen beide
+    Endknoten eines aktiven Elements das kleinere Label. Konvergiert in
+    O(log(Durchmesser)) bis O(Durchmesser) Durchläufen.
+
+    Rückgabe:
+        labels (np.ndarray): Komponentennummer 0..k-1 je Knoten, -1 für inaktive Knoten.
+        hat_lager (np.ndarray): Bool je Komponente, True wenn sie ein Lager enthält.
+        hat_last (np.ndarray): Bool je Komponente, True wenn sie eine Last trägt.
+    """
+    n = len(structure.nodes)
+    aktiv = structure.hole_aktiv_maske()
+    a, b = structure.hole_verbindungsarrays()
+
+    kanten = aktiv[a] & aktiv[b]
+    a = a[kanten]
+    b = b[kanten]
+
+    labels = np.arange(n, dtype=np.intp)
+    while True:
+        vorher = labels
+        labels = labels.copy()
+        m = np.minimum(labels[a], labels[b])
+        np.minimum.at(labels, a, m)
+        np.minimum.at(labels, b, m)
+        labels = labels[labels]  # Pointer-Jumping
+        if np.array_equal(labels, vorher):
+            break
+
+    # Auf 0..k-1 umnummerieren, inaktive Knoten -> -1
+    ergebnis = np.full(n, -1, dtype=np.intp)
+    wurzeln, kompakt = np.unique(labels[aktiv], return_inverse=True)
+    ergebnis[aktiv] = kompakt
+    n_komp = len(wurzeln)
+
+    gelagert = np.fromiter((any(node.fixed) for node in structure.nodes), dtype=bool, count=n)
+    hat_lager = np.zeros(n_komp, dtype=bool)
+    hat_lager[ergebnis[gelagert & aktiv]] = True
+
+    last_ids = np.array([nid for nid in structure.forces if 0 <= nid < n], dtype=np.intp)
+    hat_last = np.zeros(n_komp, dtype=bool)
+    if len(last_ids):
+        last_ids = last_ids[aktiv[last_ids]]
+        hat_last[ergebnis[last_ids]] = True
+
+    return ergebnis, hat_lager, hat_last
+
+
 def check_connectivity(structure: Structure) -> bool:
     """
-    Prüft mittels Graphen-Algorithmus (BFS oder DFS), ob die Struktur
-    noch zusammenhängend ist und Lager erreichen kann.
+    Prüft, ob die Struktur noch zusammenhängend ist und Lager erreichen kann,
+    d.h. jede aktive Komponente mindestens ein Lager enthält
+    (gleiche Aussage wie Structure.check_stability).
     """
-    # Später implementieren wir hier eine Breitensuche
-    pass
\ No newline at end of file
+    labels, hat_lager, _ = label_components(structure)
+    if len(hat_lager) == 0:
+        return False
+    return bool(hat_lager.all())
+
+
+def remove_islands(structure: Structure) -> list[int]:
+    """
+    Deaktiviert in einem Schritt alle Inseln, d.h. Komponenten ohne Lager und ohne Last.
+    Komponenten mit Last aber ohne Lager bleiben unangetastet.
+
+    Rückgabe: IDs der deaktivierten Knoten (zum evtl. Wiederherstellen).
+    """
+    labels, hat_lager, hat_last = label_components(structure)
+    insel = ~hat_lager & ~hat_last
+    if not insel.any():
+        return []
+
+    maske = labels >= 0
+    maske[maske] = insel[labels[maske]]
+    ids = np.flatnonzero(maske).tolist()
+    for nid in ids:
+        structure.nodes[nid].active = False
+    return ids
@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.sparse.linalg import ArpackError, eigsh
+
+
+def modal_analysis(structure, k=6, v0=None, sigma=None, mech_tol=1e-8):
+    """
+    Modalanalyse: niedrigste k elastische Eigenpaare von K phi = omega^2 M phi.
+
+    K ist die dünnbesetzte Steifigkeitsmatrix, M die konzentrierte Massenmatrix aus Node.mass,
+    beide reduziert auf die freien DOFs der aktiven Knoten. Gelöst wird mit Lanczos im
+    Shift-Invert-Modus (ARPACK), ohne dichte Eigenzerlegung.
+
+    Optimierte Fachwerke enthalten oft Mechanismen (Null-Moden von K). Eigenwerte unter
+    mech_tol * mean(diag K) / mean(diag M) gelten als Mechanismus, werden nicht als Frequenz
+    ausgegeben, sondern nur gezählt. Dafür werden k + Anzahl Mechanismen Paare berechnet.
+
+    Parameter:
+        k: Anzahl der gesuchten elastischen Eigenpaare.
+        v0: Startvektor (globaler DOF-Vektor, z.B. Eigenform der letzten Iteration).
+        sigma: Shift. Standard ist ein kleiner negativer Wert, damit K - sigma*M auch bei
+            Mechanismus-Moden regulär bleibt.
+        mech_tol: Relative Schwelle für Mechanismus-Moden.
+
+    Rückgabe:
+        frequenzen (np.ndarray): Elastische Eigenfrequenzen f = omega / (2 pi) in Hz, aufsteigend
+            (weniger als k, falls nicht genug elastische Moden existieren).
+        moden (np.ndarray): Zugehörige Eigenformen als globale DOF-Vektoren, Form (n_dof, len(f)).
+        n_mech (int): Anzahl der gefundenen Mechanismus-Moden.
+    """
+    frei = structure.hole_freie_dofs()
+    n = len(frei)
+    if n < 2:
+        raise ValueError("Modalanalyse braucht mindestens zwei freie Freiheitsgrade.")
+
+    K = structure.erstelle_globale_steifigkeitsmatrix_sparse()[frei][:, frei].tocsc()
+    M = structure.erstelle_massenmatrix()[frei][:, frei].tocsc()
+
+    m_diag = M.diagonal()
+    if not np.all(m_diag > 0):
+        raise ValueError("Alle aktiven Knoten brauchen eine positive Masse.")
+
+    skala = K.diagonal().mean() / m_diag.mean()
+    if sigma is None:
+        sigma = -1e-6 * skala
+    grenze = mech_tol * skala
+
+    start = None
+    if v0 is not None:
+        start = np.asarray(v0, dtype=np.float64)[frei]
+        if not np.any(start):
+            start = None
+
+    # Solange alle berechneten Paare (bis auf < k) Mechanismen sind, mehr anfordern
+    n_mech = 0
+    while True:
+        n_paare = min(k + n_mech, n - 1)
+        eigenwerte, phi = eigsh(K, k=n_paare, M=M, sigma=sigma, which='LM', v0=start)
+        reihenfolge = np.argsort(eigenwerte)
+        eigenwerte, phi = eigenwerte[reihenfolge], phi[:, reihenfolge]
+
+        mechanismus = eigenwerte < grenze
+        n_gefunden = int(mechanismus.sum())
+        if n_paare - n_gefunden >= k or n_paare == n - 1 or n_gefunden <= n_mech:
+            n_mech = n_gefunden
+            break
+        n_mech = n_gefunden
+
+    eigenwerte = eigenwerte[~mechanismus][:k]
+    phi = phi[:, ~mechanismus][:, :k]
+
+    moden = np.zeros((len(structure.nodes) * 2, len(eigenwerte)))
+    moden[frei] = phi
+
+    return np.sqrt(eigenwerte) / (2.0 * np.pi), moden, n_mech
+
+
+class FrequencyTracker:
+    """
+    Verfolgt die erste Eigenfrequenz über die Iterationen der Optimierung.
+
+    Jede Iteration wird nur das unterste Eigenpaar gesucht, mit der Eigenform der vorherigen
+    Iteration als Startvektor. Da sich die Topologie pro Schritt nur wenig ändert, konvergiert
+    Lanczos dann in wenigen Schritten.
+
+    Mechanismus-Moden zählen nicht als erste Frequenz, ihre Anzahl steht in 'mechanisms'.
+    Lässt sich keine elastische Frequenz bestimmen (z.B. weniger als zwei freie DOFs), wird nan
+    verbucht, damit die Optimierung nicht abbricht.
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.history = []
+        self.mechanisms = []
+
+    def update(self, structure) -> float:
+        try:
+            frequenzen, moden, n_mech = modal_analysis(structure, k=1, v0=self.mode)
+        except (ValueError, ArpackError):
+            frequenzen, n_mech = [], 0
+
+        self.mechanisms.append(n_mech)
+        if len(frequenzen) == 0:
+            self.mode = None
+            self.history.append(float('nan'))
+            return self.history[-1]
+
+        self.mode = moden[:, 0]
+        self.history.append(float(frequenzen[0]))
+        return self.history[-1]
@@ -1,5 +1,9 @@
 import numpy as np
 
+from ..model.structure import Structure
+from .cache import SolutionCache, solve_cached
+from .graph_utils import remove_islands
+
 
 def symmetrize_energies(structure, energies, width):
     height = getattr(structure, 'height', len(structure.nodes) // width)
@@ -35,10 +39,30 @@ def filter_energies(structure, energies):
     return smoothed_energies
 
 
-def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
+def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015, drop_islands=False,
+                     cache=None, callback=None, frequency_tracker=None, scheduler=None):
     """
     Führt die Topologieoptimierung mit strikter Symmetrie-Kopplung durch.
+
+    drop_islands: Wenn True, wird ein Löschschritt, der Inseln ohne Lager und Last
+    abtrennt, nicht verworfen, sondern die Inseln werden gesammelt mit entfernt.
+    cache: SolutionCache, der über mehrere Läufe geteilt werden kann (z.B. bei Parameterstudien).
+    Ohne Angabe wird ein eigener Cache für diesen Lauf angelegt.
+    callback: Wird nach jeder Iteration mit einem dict (iteration, active, target, delta,
+    compliance, rate) aufgerufen.
+    frequency_tracker: FrequencyTracker, der nach jeder Iteration die erste Eigenfrequenz
+    der aktuellen Topologie bestimmt (zusätzlich 'f1' und 'mechanisms' im callback-dict).
+    scheduler: RemovalRateScheduler, der die Entfernungsrate anhand der Compliance anpasst und
+    Schritte mit zu großem Compliance-Sprung zurücknimmt. Ohne Angabe gilt fest removal_rate,
+    sonst ist removal_rate die Startrate (falls der Scheduler keine eigene initial_rate hat).
     """
+    if cache is None:
+        cache = SolutionCache()
+    misses_start, hits_start = cache.misses, cache.hits
+
+    if scheduler is not None and scheduler.rate is None:
+        scheduler.rate = removal_rate
+
     initial_active = [n for n in structure.nodes if n.active]
     start_count = len(initial_active)
     target_count = int(start_count * target_mass_ratio)
@@ -54,6 +78,8 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
     stagnation_counter = 0
 
     history_energies = {}
+    compliance = None
+    snapshot = None  # Stand vor dem letzten Löschschritt (für Backtracking)
 
     while True:
         current_active = [n for n in structure.nodes if n.active]
@@ -78,14 +104,31 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
 
         iteration += 1
 
-        # 1. FEM
-        u = structure.loese_system()
+        # 1. FEM + 2. Energie (bereits gelöste Topologien kommen aus dem Cache)
+        u, raw_energies = solve_cached(structure, cache)
         if u is None:
             print("Abbruch: Instabil.")
             break
 
-        # 2. Energie
-        raw_energies = structure.berechne_knoten_energien(u)
+        # Compliance = gesamte Verformungsenergie
+        compliance = sum(raw_energies.values())
+
+        if scheduler is not None and scheduler.observe(compliance) and snapshot is not None:
+            # Backtracking: letzten Schritt zurücknehmen und mit kleinerer Rate wiederholen.
+            # Lösung und Energien des alten Stands sind bekannt, es ist kein neuer Solve nötig.
+            aktiv_vorher, u, raw_energies, history_energies, compliance = snapshot
+            for node in structure.nodes:
+                node.active = bool(aktiv_vorher[node.id])
+            structure.speichere_verschiebungen(u)
+
+            current_active = [n for n in structure.nodes if n.active]
+            current_count = len(current_active)
+            last_count = current_count
+            print(f"{'':<5} | {current_count:<8} | {target_count:<8} | "
+                  f"Backtracking, Rate -> {scheduler.rate:.1%}")
+
+        if scheduler is not None:
+            snapshot = (structure.hole_aktiv_maske(), u, raw_energies, history_energies, compliance)
 
         # 3. Momentum (Historie)
         current_energies = {}
@@ -149,13 +192,16 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
         candidate_pairs.sort(key=lambda x: x[1])
 
         # Schrittweite (z.B. entferne 1.5% der Knoten)
-        step_size = max(1, int(current_count * removal_rate))
+        rate = scheduler.rate if scheduler is not None else removal_rate
+        step_size = max(1, int(current_count * rate))
         dist_to_target = current_count - target_count
         step_size = min(step_size, dist_to_target)
         if step_size < 1: step_size = 1
 
         # 6. Löschen (Gekoppelt)
         removed_nodes_count = 0
+        attempts = 0
+        rejections = 0
 
         for pair_ids, _ in candidate_pairs:
             # Haben wir genug gelöscht? (Achtung: Ein Paar kann 1 oder 2 Knoten haben)
@@ -163,6 +209,7 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
                 break
 
             # 1. Versuchen BEIDE zu löschen
+            attempts += 1
             for pid in pair_ids:
                 structure.nodes[pid].active = False
 
@@ -170,18 +217,46 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
             if structure.check_stability():
                 # Erfolg! Beide bleiben gelöscht.
                 removed_nodes_count += len(pair_ids)
-            else:
-                # Fehlschlag! BEIDE wiederherstellen.
-                # Wir opfern keinen Zwilling für den anderen -> Symmetrie bleibt erhalten.
-                for pid in pair_ids:
-                    structure.nodes[pid].active = True
+                continue
+
+            if drop_islands:
+                # Abgetrennte Inseln (ohne Lager/Last) in einem Schritt mit entfernen
+                island_ids = remove_islands(structure)
+                if island_ids and structure.check_stability():
+                    removed_nodes_count += len(pair_ids) + len(island_ids)
+                    continue
+                for nid in island_ids:
+                    structure.nodes[nid].active = True
+
+            # Fehlschlag! BEIDE wiederherstellen.
+            # Wir opfern keinen Zwilling für den anderen -> Symmetrie bleibt erhalten.
+            rejections += 1
+            for pid in pair_ids:
+                structure.nodes[pid].active = True
+
+        if scheduler is not None:
+            scheduler.report_rejections(attempts, rejections)
 
         # Cleanup
         structure.entferne_tote_aeste()
 
         final_count_in_step = len([n for n in structure.nodes if n.active])
         delta = last_count - final_count_in_step
-        print(f"{iteration:<5} | {final_count_in_step:<8} | {target_count:<8} | Delta: {delta:+d}")
+        info = {'iteration': iteration, 'active': final_count_in_step, 'target': target_count,
+                'delta': delta, 'compliance': compliance, 'rate': rate}
+        status = f"Delta: {delta:+d} | C: {compliance:.4g}"
+        if scheduler is not None:
+            status += f" | Rate: {rate:.1%}"
+        if frequency_tracker is not None:
+            info['f1'] = frequency_tracker.update(structure)
+            info['mechanisms'] = frequency_tracker.mechanisms[-1]
+            status += f" | f1: {info['f1']:.4g} Hz"
+            if info['mechanisms']:
+                status += f" ({info['mechanisms']} Mech.)"
+
+        print(f"{iteration:<5} | {final_count_in_step:<8} | {target_count:<8} | {status}")
+        if callback is not None:
+            callback(info)
 
     # Post-Processing
     print("Post-Processing: Struktur bereinigen...")
@@ -191,5 +266,132 @@ def run_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015):
 
     final = len([n for n in structure.nodes if n.active])
     print(f"Fertig. Endgültige Knotenanzahl: {final}")
+    # Compliance der fertigen Struktur (nach Post-Processing), vergleichbar zwischen Läufen
+    u, final_energies = solve_cached(structure, cache)
+    if u is not None:
+        print(f"Compliance (Endstruktur): {sum(final_energies.values()):.6g}")
+    print(f"Iterationen: {iteration} | FEM-Lösungen: {cache.misses - misses_start} | "
+          f"Cache-Treffer: {cache.hits - hits_start}")
+    if scheduler is not None:
+        print(f"Adaptive Rate: {scheduler.backtracks} Backtracking-Schritte, End-Rate {scheduler.rate:.1%}")
+
+    return structure
+
+
+def _map_index(i, n_fine, n_coarse):
+    """
+    Bildet einen Gitterindex 0..n_fine-1 auf den nächsten Index 0..n_coarse-1 ab.
+    Die rechte Hälfte wird gespiegelt berechnet, damit die Abbildung symmetrisch bleibt.
+    """
+    if n_fine <= 1 or n_coarse <= 1:
+        return 0
+    if 2 * i > n_fine - 1:
+        return n_coarse - 1 - _map_index(n_fine - 1 - i, n_fine, n_coarse)
+    return int(np.floor(i * (n_coarse - 1) / (n_fine - 1) + 0.5))
+
+
+def coarsen_grid(structure, factor=2):
+    """
+    Erzeugt ein um 'factor' vergröbertes Gitter zu einer create_grid-Struktur.
+    Lasten werden auf den nächsten Grobknoten summiert, Lager per ODER übertragen.
 
-    return structure
\ No newline at end of file
+    Rückgabe: (grobe Struktur, Zeilen-Abbildung fein->grob, Spalten-Abbildung fein->grob)
+    """
+    width, height = structure.width, structure.height
+    width_c = (width - 1) // factor + 1
+    height_c = (height - 1) // factor + 1
+
+    coarse = Structure.create_grid(width_c, height_c)
+
+    map_x = np.array([_map_index(x, width, width_c) for x in range(width)])
+    map_z = np.array([_map_index(z, height, height_c) for z in range(height)])
+
+    # Lager: Standardlager des Grobgitters verwerfen und die des feinen Gitters übertragen
+    for node in coarse.nodes:
+        node.setze_randbedingung([False, False])
+    for node in structure.nodes:
+        if not any(node.fixed):
+            continue
+        cid = map_z[node.id // width] * width_c + map_x[node.id % width]
+        coarse_node = coarse.nodes[cid]
+        coarse_node.setze_randbedingung([a or b for a, b in zip(coarse_node.fixed, node.fixed)])
+
+    for nid, force in structure.forces.items():
+        cid = map_z[nid // width] * width_c + map_x[nid % width]
+        if cid in coarse.forces:
+            coarse.forces[cid] = coarse.forces[cid] + force
+        else:
+            coarse.last_aufbringen(cid, force[0], force[1])
+
+    return coarse, map_z, map_x
+
+
+# Optionen von run_optimization, die auch auf den Grobgittern sinnvoll sind. callback,
+# frequency_tracker und scheduler sind zustandsbehaftet bzw. an das feine Gitter gebunden.
+_COARSE_OPTIONS = ('drop_islands', 'cache')
+
+
+def run_multiresolution_optimization(structure, target_mass_ratio=0.4, removal_rate=0.015,
+                                     levels=1, factor=2, coarse_margin=0.2, min_size=5, fine_iterations=3,
+                                     max_fine_rate_factor=1.5, **kwargs):
+    """
+    Coarse-to-Fine-Optimierung für create_grid-Strukturen.
+
+    Optimiert zuerst auf einem um 'factor' vergröberten Gitter (rekursiv über 'levels' Stufen)
+    bis knapp über das Ziel (target_mass_ratio * (1 + coarse_margin)), überträgt die aktive
+    Maske per Nearest-Neighbour zurück auf das feine Gitter und optimiert dort nur noch den
+    Rest. Die Entfernungsrate auf dem feinen Gitter wird so erhöht, dass das Ziel in etwa
+    'fine_iterations' Schritten erreicht wird, höchstens aber auf
+    max_fine_rate_factor * removal_rate. Größere Sprünge direkt nach dem Hochskalieren
+    verschlechtern die Compliance deutlich (41x11: Faktor 3 -> ca. +35 %, Faktor 1.5 -> ca. +2 %
+    gegenüber festem removal_rate). Dadurch fallen die meisten FEM-Lösungen auf den kleinen
+    Gittern an.
+
+    Weitere Schlüsselwörter (drop_islands, cache, callback, frequency_tracker, scheduler) gehen
+    an run_optimization auf dem feinen Gitter; drop_islands und cache auch an die Grobgitter.
+    """
+    width = getattr(structure, 'width', 0)
+    height = getattr(structure, 'height', 0)
+    width_c = (width - 1) // factor + 1 if width else 0
+    height_c = (height - 1) // factor + 1 if height else 0
+
+    if levels <= 0 or factor < 2 or min(width_c, height_c) < min_size:
+        return run_optimization(structure, target_mass_ratio, removal_rate, **kwargs)
+
+    start_mask = structure.hole_aktiv_maske()
+    start_count = int(start_mask.sum())
+    target_count = int(start_count * target_mass_ratio)
+
+    # 1. Grobgitter optimieren
+    coarse, map_z, map_x = coarsen_grid(structure, factor)
+    coarse_ratio = min(1.0, target_mass_ratio * (1.0 + coarse_margin))
+    print(f"=== GROBGITTER {width_c}x{height_c} (Stufe {levels}) ===")
+    coarse_kwargs = {key: kwargs[key] for key in _COARSE_OPTIONS if key in kwargs}
+    run_multiresolution_optimization(coarse, coarse_ratio, removal_rate, levels - 1, factor,
+                                     coarse_margin, min_size, fine_iterations, max_fine_rate_factor,
+                                     **coarse_kwargs)
+
+    # 2. Maske hochskalieren (Lager und Lasten bleiben immer aktiv)
+    coarse_mask = coarse.hole_aktiv_maske().reshape(height_c, width_c)
+    fine_mask = coarse_mask[np.ix_(map_z, map_x)].ravel()
+    for node in structure.nodes:
+        if any(node.fixed) or node.id in structure.forces:
+            continue
+        if node.active and not fine_mask[node.id]:
+            node.active = False
+
+    structure.entferne_tote_aeste()
+    if not structure.check_stability():
+        # Sollte nicht vorkommen, zur Sicherheit normal von der Eingangstopologie aus optimieren
+        print("Hochskalierte Topologie instabil, starte fein mit der Ausgangstopologie.")
+        for node in structure.nodes:
+            node.active = bool(start_mask[node.id])
+        return run_optimization(structure, target_mass_ratio, removal_rate, **kwargs)
+
+    # 3. Feingitter ausgehend von der hochskalierten Topologie weiter optimieren
+    current_count = len([n for n in structure.nodes if n.active])
+    fine_ratio = min(1.0, target_count / current_count) if current_count else 1.0
+    fine_rate = max(removal_rate, 1.0 - fine_ratio ** (1.0 / max(1, fine_iterations)))
+    fine_rate = min(fine_rate, max_fine_rate_factor * removal_rate)
+    print(f"=== FEINGITTER {width}x{height} ===")
+    return run_optimization(structure, fine_ratio, fine_rate, **kwargs)
@@ -0,0 +1,68 @@
+class RemovalRateScheduler:
+    """
+    Adaptive Schrittweitensteuerung für die Entfernungsrate in run_optimization.
+
+    Grundlage ist die Compliance C = Summe der Verformungsenergien, die pro Iteration ohnehin
+    berechnet wird. Die relative Änderung von C gegenüber dem letzten akzeptierten Stand steuert
+    die Rate:
+        - Änderung < low_change:  Rate wird mit 'grow' vergrößert (bis max_rate).
+        - Änderung > high_change: der letzte Schritt wird verworfen (Backtracking) und die Rate
+          mit 'shrink' verkleinert, solange sie über min_rate liegt.
+        - Werden mehr als max_rejection der Löschversuche wegen Instabilität abgelehnt,
+          wird die Rate ebenfalls verkleinert.
+
+    initial_rate=None übernimmt die removal_rate, mit der run_optimization aufgerufen wird.
+
+    Die Standardwerte sind auf Gittern von 21x9 bis 51x13 (Last oben mittig, Ziel 0.5,
+    removal_rate 0.02) abgestimmt: 15-19 statt 35-38 FEM-Lösungen. Die End-Compliance liegt dabei
+    je nach Gitter zwischen -75 % und +50 % der festen Rate, weil der Verlauf der Optimierung
+    empfindlich von der Schrittfolge abhängt. Ein engeres high_change (z.B. 0.15) oder
+    max_rate 0.1 führt zu wiederholtem Backtracking und kostet die Ersparnis großteils wieder.
+    """
+
+    def __init__(self, initial_rate=None, min_rate=0.005, max_rate=0.05, grow=1.5, shrink=0.5,
+                 low_change=0.02, high_change=0.5, max_rejection=0.5):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.grow = grow
+        self.shrink = shrink
+        self.low_change = low_change
+        self.high_change = high_change
+        self.max_rejection = max_rejection
+
+        self.reference = None
+        self.backtracks = 0
+        self.history = []
+
+    def _verkleinern(self):
+        self.rate = max(self.min_rate, self.rate * self.shrink)
+
+    def observe(self, compliance: float) -> bool:
+        """
+        Bewertet den letzten Schritt anhand der neuen Compliance.
+        Gibt True zurück, wenn der Schritt rückgängig gemacht werden soll.
+        """
+        self.history.append((compliance, self.rate))
+
+        if self.reference is None or self.reference == 0:
+            self.reference = compliance
+            return False
+
+        change = (compliance - self.reference) / abs(self.reference)
+
+        if change > self.high_change and self.rate > self.min_rate:
+            self._verkleinern()
+            self.backtracks += 1
+            return True
+
+        if abs(change) < self.low_change:
+            self.rate = min(self.max_rate, self.rate * self.grow)
+
+        self.reference = compliance
+        return False
+
+    def report_rejections(self, attempted: int, rejected: int):
+        """Meldet, wie viele Löschversuche die Stabilitätsprüfung nicht bestanden haben."""
+        if attempted and rejected / attempted > self.max_rejection:
+            self._verkleinern()
@@ -1,8 +1,22 @@
 import numpy as np
+import scipy.sparse as sp
 from typing import List
 from .node import Node
 from .element import Element, Spring2D
 
+# 8er-Nachbarschaft eines Gitterknotens (dz, dx): waagrecht, senkrecht und beide Diagonalen
+_GITTER_NACHBARN = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def _nachbar_anzahl_gitter(maske: np.ndarray) -> np.ndarray:
+    """Anzahl der True-Nachbarn (8er-Nachbarschaft) für jede Zelle einer 2D-Maske (3x3-Stencil)."""
+    h, w = maske.shape
+    p = np.pad(maske.astype(np.int8), 1)
+    anzahl = np.zeros((h, w), dtype=np.int8)
+    for dz, dx in _GITTER_NACHBARN:
+        anzahl += p[1 + dz:1 + dz + h, 1 + dx:1 + dx + w]
+    return anzahl
+
 
 class Structure:
     def __init__(self):
@@ -10,6 +24,9 @@ class Structure:
         self.elements: List[Element] = []
         self.forces = {}
 
+        # Cache für hole_verbindungsarrays (ungültig, sobald sich die Elementliste ändert)
+        self._verbindungen = None
+
     def knoten_hinzufuegen(self, x: float, z: float, fixierte_dofs: List[bool] = None) -> Node:
         node_id = len(self.nodes)
         if fixierte_dofs is None:
@@ -39,19 +56,38 @@ class Structure:
         self.forces[node_id] = np.array([fx, fz])
 
     def erstelle_globale_steifigkeitsmatrix(self) -> np.ndarray:
+        return self.erstelle_globale_steifigkeitsmatrix_sparse().toarray()
+
+    def erstelle_globale_steifigkeitsmatrix_sparse(self) -> sp.csr_matrix:
+        """Globale Steifigkeitsmatrix aller aktiven Elemente als dünnbesetzte CSR-Matrix."""
         n_dof = len(self.nodes) * 2
-        k_global = np.zeros((n_dof, n_dof))
+        zeilen, spalten, werte = [], [], []
 
         for element in self.elements:
             if element.node_a.active and element.node_b.active:
                 k_element = element.berechne_transformierte_steifigkeitsmatrix()
                 indizes = element.node_a.global_dof_indices + element.node_b.global_dof_indices
 
-                for local_row, global_row in enumerate(indizes):
-                    for local_col, global_col in enumerate(indizes):
-                        k_global[global_row, global_col] += k_element[local_row, local_col]
+                zeilen.extend(np.repeat(indizes, len(indizes)))
+                spalten.extend(np.tile(indizes, len(indizes)))
+                werte.extend(k_element.ravel())
+
+        # Doppelte Einträge werden beim Umwandeln aufsummiert
+        return sp.coo_matrix((werte, (zeilen, spalten)), shape=(n_dof, n_dof)).tocsr()
+
+    def erstelle_massenmatrix(self) -> sp.csr_matrix:
+        """
+        Konzentrierte (lumped) Massenmatrix M = diag(m_1, m_1, m_2, m_2, ...).
+        Inaktive Knoten tragen keine Masse.
+        """
+        massen = np.array([node.mass if node.active else 0.0 for node in self.nodes])
+        return sp.diags(np.repeat(massen, 2)).tocsr()
 
-        return k_global
+    def hole_freie_dofs(self) -> np.ndarray:
+        """Globale DOF-Indizes aller aktiven Knoten, die nicht durch Lager festgehalten sind."""
+        return np.array([idx for node in self.nodes if node.active
+                         for idx, is_fixed in zip(node.global_dof_indices, node.fixed) if not is_fixed],
+                        dtype=np.intp)
 
     def erstelle_kraftvektor(self) -> np.ndarray:
         n_dof = len(self.nodes) * 2
@@ -145,6 +181,22 @@ class Structure:
             uz = u[node.global_dof_indices[1]]
             node.displacements = np.array([ux, uz])
 
+    def hole_aktiv_maske(self) -> np.ndarray:
+        """Bool-Array: True für jeden aktiven Knoten (Index = Knoten-ID)."""
+        return np.fromiter((n.active for n in self.nodes), dtype=bool, count=len(self.nodes))
+
+    def hole_verbindungsarrays(self):
+        """
+        Knoten-IDs aller Elemente als Arrays (a, b) mit a[e], b[e] = Endknoten von Element e.
+        Wird gecacht, solange sich die Anzahl der Elemente nicht ändert.
+        """
+        if self._verbindungen is None or len(self._verbindungen[0]) != len(self.elements):
+            n_el = len(self.elements)
+            a = np.fromiter((el.node_a.id for el in self.elements), dtype=np.intp, count=n_el)
+            b = np.fromiter((el.node_b.id for el in self.elements), dtype=np.intp, count=n_el)
+            self._verbindungen = (a, b)
+        return self._verbindungen
+
     def hole_nachbar_indizes(self, node_id: int) -> List[int]:
         nachbarn = []
         for el in self.elements:
@@ -166,11 +218,81 @@ class Structure:
                 nachbarn.append(el.node_a.id)
         return nachbarn
 
+    def _ist_gitter(self) -> bool:
+        """True, wenn die Struktur (noch) exakt das Gitter aus create_grid ist."""
+        width = getattr(self, 'width', None)
+        height = getattr(self, 'height', None)
+        if width is None or height is None or len(self.nodes) != width * height:
+            return False
+        n_elemente = height * (width - 1) + (height - 1) * width + 2 * (height - 1) * (width - 1)
+        return len(self.elements) == n_elemente
+
+    def _hole_gitter_masken(self):
+        """Aktiv- und Schutzmaske (Lager/Lasten) als (height x width)-Arrays."""
+        aktiv = self.hole_aktiv_maske().reshape(self.height, self.width)
+        geschuetzt = np.fromiter((any(n.fixed) or (n.id in self.forces) for n in self.nodes),
+                                 dtype=bool, count=len(self.nodes)).reshape(self.height, self.width)
+        return aktiv, geschuetzt
+
+    def _entferne_tote_aeste_gitter(self):
+        """Wie entferne_tote_aeste, aber als Stencil über die gesamte Gitter-Maske."""
+        aktiv, geschuetzt = self._hole_gitter_masken()
+        start = aktiv.copy()
+
+        while True:
+            # Bei aktiven Knoten entspricht die Zahl aktiver Gitter-Nachbarn der Zahl aktiver Elemente
+            tot = aktiv & ~geschuetzt & (_nachbar_anzahl_gitter(aktiv) < 2)
+            if not tot.any():
+                break
+            aktiv &= ~tot
+
+        for nid in np.flatnonzero(start & ~aktiv):
+            self.nodes[nid].active = False
+
+    def _fuelle_loecher_gitter(self):
+        """
+        Wie fuelle_loecher, aber vektorisiert auf der Gitter-Maske.
+
+        Die Schleife in fuelle_loecher arbeitet sequentiell: ein reaktivierter Knoten zählt für
+        alle danach besuchten Nachbarn bereits mit. Um exakt dasselbe Ergebnis zu liefern, werden
+        die Kandidaten in Wellenfronten 2*z + x abgearbeitet. Alle früher besuchten Nachbarn
+        eines Knotens liegen in einer früheren Welle, alle später besuchten in einer späteren.
+        """
+        aktiv, geschuetzt = self._hole_gitter_masken()
+        kandidaten = ~aktiv & ~geschuetzt
+
+        # Obere Schranke: auch wenn alle Kandidaten reaktiviert würden, braucht ein Knoten >= 5
+        moeglich = kandidaten & (_nachbar_anzahl_gitter(aktiv | kandidaten) >= 5)
+        if not moeglich.any():
+            return
+
+        z, x = np.nonzero(moeglich)
+        welle = 2 * z + x
+        reihenfolge = np.argsort(welle, kind='stable')
+        z, x, welle = z[reihenfolge], x[reihenfolge], welle[reihenfolge]
+        grenzen = np.flatnonzero(np.diff(welle)) + 1
+
+        p = np.pad(aktiv.astype(np.int8), 1)
+        for wz, wx in zip(np.split(z, grenzen), np.split(x, grenzen)):
+            anzahl = np.zeros(len(wz), dtype=np.int8)
+            for dz, dx in _GITTER_NACHBARN:
+                anzahl += p[wz + 1 + dz, wx + 1 + dx]
+            treffer = anzahl >= 5
+            p[wz[treffer] + 1, wx[treffer] + 1] = 1
+
+        neu = p[1:-1, 1:-1].astype(bool) & ~aktiv
+        for nid in np.flatnonzero(neu):
+            self.nodes[nid].active = True
+
     def entferne_tote_aeste(self):
         """
         Löscht REKURSIV alle Knoten, die weniger als 2 Nachbarn haben.
         Macht solange weiter, bis das Gitter 'sauber' ist.
         """
+        if self._ist_gitter():
+            self._entferne_tote_aeste_gitter()
+            return
+
         while True:
             nodes_removed_in_pass = 0
 
@@ -199,6 +321,10 @@ class Structure:
     def fuelle_loecher(self):
         """Reaktiviert Knoten, die von aktiven Knoten umzingelt sind."""
         # Dies ist eine rein geometrische Operation
+        if self._ist_gitter():
+            self._fuelle_loecher_gitter()
+            return
+
         for node in self.nodes:
             if node.active: continue
             if any(node.fixed) or (node.id in self.forces): continue
@@ -0,0 +1 @@
+from .job_server import JobServer, submit_job
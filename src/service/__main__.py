@@ -0,0 +1,3 @@
+from .job_server import main
+
+main()
@@ -0,0 +1,375 @@
+"""
+Lokaler Job-Server für Optimierungsläufe.
+
+Nimmt Jobs als JSON-Zeilen über TCP auf 127.0.0.1 entgegen, reiht sie ein und führt sie in einem
+Pool warmer Worker-Prozesse aus. Fortschritt pro Iteration wird an den Client gestreamt.
+
+Protokoll (eine JSON-Nachricht pro Zeile):
+    {"op": "submit", "job": {...}, "stream": true}
+        -> {"event": "accepted", "job_id": 1}
+        -> {"event": "progress", "job_id": 1, "iteration": ..., "active": ..., ...}  (nur mit stream)
+        -> {"event": "done", "job_id": 1, "result": {...}} oder {"event": "error", ...}
+    {"op": "status", "job_id": 1}  -> {"event": "status", "job_id": 1, "status": "queued|running|done|failed"}
+    {"op": "result", "job_id": 1}  -> wartet auf den Job, dann "done" bzw. "error"
+    {"op": "stats"}                -> {"event": "stats", ...}
+
+Job-Beschreibung:
+    {"grid": {"width": 41, "height": 10},
+     "loads": [[node_id, fx, fz], ...],
+     "supports": [[node_id, fest_x, fest_z], ...],   (optional, sonst Lager aus create_grid)
+     "params": {"target_mass_ratio": 0.5, "removal_rate": 0.02}}
+
+Start:
+    python -m src.service --port 8765 --workers 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+from ..model.structure import Structure
+from ..analysis.optimizer import run_optimization
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Parameter von run_optimization, die ein Job setzen darf
+ERLAUBTE_PARAMETER = ("target_mass_ratio", "removal_rate", "drop_islands")
+
+# Wird im Worker-Prozess durch _init_worker gesetzt
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _warm_up():
+    """Leerer Auftrag, um Worker-Prozesse (inkl. Imports) vorab zu starten."""
+
+
+def baue_struktur(spec: dict) -> Structure:
+    """
+    Erzeugt die Struktur eines Jobs aus der Job-Beschreibung.
+
+    Das Gitter wird pro Job neu aufgebaut: eine Kopie (deepcopy/pickle) eines zwischengespeicherten
+    Basisgitters ist wegen der vielen Node-/Element-Objekte langsamer als create_grid selbst.
+    """
+    try:
+        width = int(spec["grid"]["width"])
+        height = int(spec["grid"]["height"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Job braucht 'grid' mit 'width' und 'height'.")
+    if width < 1 or height < 1:
+        raise ValueError("Gittergröße muss positiv sein.")
+
+    struct = Structure.create_grid(width, height)
+
+    supports = spec.get("supports")
+    if supports is not None:
+        for node in struct.nodes:
+            node.setze_randbedingung([False, False])
+        for node_id, fest_x, fest_z in supports:
+            node_id = int(node_id)
+            if not 0 <= node_id < len(struct.nodes):
+                raise ValueError(f"Ungültige Knoten-ID für Lager: {node_id}")
+            struct.nodes[node_id].setze_randbedingung([bool(fest_x), bool(fest_z)])
+
+    for node_id, fx, fz in spec.get("loads", []):
+        node_id = int(node_id)
+        if not 0 <= node_id < len(struct.nodes):
+            raise ValueError(f"Ungültige Knoten-ID für Last: {node_id}")
+        struct.last_aufbringen(node_id, float(fx), float(fz))
+
+    return struct
+
+
+def run_job(job_id: int, spec: dict) -> dict:
+    """
+    Läuft im Worker-Prozess: baut die Struktur, optimiert und meldet Fortschritt.
+    Zum Schluss (auch bei Fehlern) folgt die Endmarke (job_id, None) in der Fortschritts-Queue.
+    """
+    try:
+        return _optimiere_job(job_id, spec)
+    finally:
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, None))
+
+
+def _optimiere_job(job_id: int, spec: dict) -> dict:
+    struct = baue_struktur(spec)
+
+    params = spec.get("params", {})
+    unbekannt = set(params) - set(ERLAUBTE_PARAMETER)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Parameter: {sorted(unbekannt)}")
+
+    def callback(info):
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, info))
+
+    # Konsolenausgabe des Optimierers gehört nicht in die Server-Konsole
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_optimization(struct, callback=callback, **params)
+
+    return {
+        "width": struct.width,
+        "height": struct.height,
+        "active": [n.id for n in struct.nodes if n.active],
+        "count": sum(1 for n in struct.nodes if n.active),
+    }
+
+
+class Job:
+    def __init__(self, job_id: int, spec: dict):
+        self.id = job_id
+        self.spec = spec
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.progress = []
+        self.subscribers = []
+        self.done = asyncio.Event()
+        # Gesetzt, sobald die Endmarke des Workers angekommen ist (alle Fortschrittsmeldungen verteilt)
+        self.progress_done = asyncio.Event()
+
+    def abschluss_nachricht(self) -> dict:
+        if self.status == "done":
+            return {"event": "done", "job_id": self.id, "result": self.result}
+        return {"event": "error", "job_id": self.id, "message": self.error}
+
+
+class JobServer:
+    """
+    asyncio-Server mit ProcessPoolExecutor als Backend.
+
+    max_workers: Anzahl gleichzeitig laufender Jobs (= Worker-Prozesse).
+    max_queued: Maximale Anzahl wartender + laufender Jobs, darüber werden Jobs abgelehnt.
+    max_history: Anzahl abgeschlossener Jobs, die für status/result aufbewahrt werden.
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, max_workers: int = 2, max_queued: int = 32,
+                 max_history: int = 100):
+        self.port = port
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_history = max_history
+
+        self.jobs = {}
+        self._finished = deque()
+        self._tasks = set()
+        self._slots = asyncio.Semaphore(max_workers)
+        self._ids = itertools.count(1)
+        self._server = None
+        self._executor = None
+        self._progress_queue = None
+        self._pump_task = None
+
+    async def start(self):
+        # 'spawn' statt 'fork': geforkte Worker würden offene Client-Sockets erben und
+        # damit das Schließen von Verbindungen verhindern
+        ctx = multiprocessing.get_context("spawn")
+        self._progress_queue = ctx.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx,
+                                             initializer=_init_worker,
+                                             initargs=(self._progress_queue,))
+
+        # Worker vorab starten, damit der erste Job nicht auf Prozessstart und Imports wartet
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up)
+                               for _ in range(self.max_workers)))
+
+        self._pump_task = asyncio.create_task(self._pump_progress())
+        self._server = await asyncio.start_server(self._handle_client, HOST, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            await self._pump_task
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Job-Server läuft auf {HOST}:{self.port} mit {self.max_workers} Workern")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def offene_jobs(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status in ("queued", "running"))
+
+    def submit(self, spec: dict) -> Job:
+        if not isinstance(spec, dict):
+            raise ValueError("'job' muss ein JSON-Objekt sein.")
+        if self.offene_jobs() >= self.max_queued:
+            raise RuntimeError(f"Warteschlange voll ({self.max_queued} Jobs).")
+        job = Job(next(self._ids), spec)
+        self.jobs[job.id] = job
+
+        # Referenz halten, sonst kann der Task während der Ausführung eingesammelt werden
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job):
+        loop = asyncio.get_running_loop()
+        # Erst an den Pool geben, wenn ein Worker frei ist -> bis dahin bleibt der Job "queued"
+        async with self._slots:
+            job.status = "running"
+            try:
+                job.result = await loop.run_in_executor(self._executor, run_job, job.id, job.spec)
+                job.status = "done"
+            except BrokenExecutor as e:
+                # Worker-Prozess abgestürzt, es kommt keine Endmarke mehr
+                job.progress_done.set()
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+
+        # Erst abschließen, wenn alle Fortschrittsmeldungen aus der Queue verteilt sind
+        await job.progress_done.wait()
+
+        job.done.set()
+        for q in job.subscribers:
+            q.put_nowait(None)
+
+        # Nur die letzten max_history abgeschlossenen Jobs aufbewahren
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_history:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    def _hole_job(self, anfrage: dict) -> Job:
+        job_id = anfrage.get("job_id")
+        if not isinstance(job_id, int) or job_id not in self.jobs:
+            raise ValueError(f"Unbekannte job_id: {job_id!r}")
+        return self.jobs[job_id]
+
+    async def _pump_progress(self):
+        """Liest Fortschrittsmeldungen der Worker und verteilt sie an die Abonnenten."""
+        loop = asyncio.get_running_loop()
+        while True:
+            eintrag = await loop.run_in_executor(None, self._progress_queue.get)
+            if eintrag is None:
+                break
+            job_id, info = eintrag
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            if info is None:
+                job.progress_done.set()
+                continue
+            nachricht = {"event": "progress", "job_id": job_id, **info}
+            job.progress.append(nachricht)
+            for q in job.subscribers:
+                q.put_nowait(nachricht)
+
+    async def _handle_client(self, reader, writer):
+        async def senden(nachricht):
+            writer.write((json.dumps(nachricht) + "\n").encode())
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    anfrage = json.loads(line)
+                    if not isinstance(anfrage, dict):
+                        raise ValueError("Anfrage muss ein JSON-Objekt sein.")
+                    await self._bearbeite(anfrage, senden)
+                except (ValueError, KeyError, TypeError, RuntimeError) as e:
+                    await senden({"event": "error", "message": f"{type(e).__name__}: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _bearbeite(self, anfrage: dict, senden):
+        op = anfrage.get("op")
+
+        if op == "submit":
+            job = self.submit(anfrage.get("job"))
+            await senden({"event": "accepted", "job_id": job.id})
+            if anfrage.get("stream", False):
+                await self._streamen(job, senden)
+
+        elif op == "status":
+            job = self._hole_job(anfrage)
+            await senden({"event": "status", "job_id": job.id, "status": job.status,
+                          "iterations": len(job.progress)})
+
+        elif op == "result":
+            job = self._hole_job(anfrage)
+            await job.done.wait()
+            await senden(job.abschluss_nachricht())
+
+        elif op == "stats":
+            await senden({"event": "stats", "jobs": len(self.jobs), "open": self.offene_jobs(),
+                          "max_workers": self.max_workers, "max_queued": self.max_queued})
+
+        else:
+            raise ValueError(f"Unbekannte Operation: {op!r}")
+
+    async def _streamen(self, job: Job, senden):
+        q = asyncio.Queue()
+        for nachricht in job.progress:
+            q.put_nowait(nachricht)
+        job.subscribers.append(q)
+        if job.done.is_set():
+            q.put_nowait(None)
+        try:
+            while (nachricht := await q.get()) is not None:
+                await senden(nachricht)
+        finally:
+            job.subscribers.remove(q)
+        await senden(job.abschluss_nachricht())
+
+
+async def submit_job(spec: dict, port: int = DEFAULT_PORT, on_progress=None) -> dict:
+    """
+    Client-Hilfe: reicht einen Job beim lokalen Server ein und wartet auf das Ergebnis.
+    on_progress wird für jede Fortschrittsmeldung aufgerufen.
+    """
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        anfrage = {"op": "submit", "job": spec, "stream": True}
+        writer.write((json.dumps(anfrage) + "\n").encode())
+        await writer.drain()
+
+        while line := await reader.readline():
+            nachricht = json.loads(line)
+            event = nachricht.get("event")
+            if event == "progress" and on_progress is not None:
+                on_progress(nachricht)
+            elif event == "done":
+                return nachricht["result"]
+            elif event == "error":
+                raise RuntimeError(nachricht["message"])
+        raise ConnectionError("Verbindung zum Job-Server unterbrochen.")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Job-Server für Optimierungsläufe")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=2, help="Gleichzeitig laufende Jobs")
+    parser.add_argument("--max-queued", type=int, default=32, help="Maximal offene Jobs")
+    args = parser.parse_args()
+
+    server = JobServer(args.port, args.workers, args.max_queued)
+    asyncio.run(server.serve_forever())
@@ -0,0 +1,66 @@
+import numpy as np
+
+from src.model.structure import Structure
+from src.analysis.cache import SolutionCache, solve_cached
+
+
+def _gitter():
+    struct = Structure.create_grid(6, 4)
+    struct.last_aufbringen(2, 0.0, 1000.0)
+    return struct
+
+
+def test_hit_on_identical_topology():
+    cache = SolutionCache()
+    u1, e1 = solve_cached(_gitter(), cache)
+    u2, e2 = solve_cached(_gitter(), cache)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(u1, u2)
+    assert e1 == e2
+
+
+def test_key_changes_with_stiffness_load_and_fixity():
+    basis = SolutionCache.key_for(_gitter())
+
+    steifer = _gitter()
+    steifer.elements[3].k *= 10
+    assert SolutionCache.key_for(steifer) != basis
+
+    last = _gitter()
+    last.last_aufbringen(3, 0.0, 1000.0)
+    assert SolutionCache.key_for(last) != basis
+
+    lager = _gitter()
+    lager.nodes[0].setze_randbedingung([True, False])
+    assert SolutionCache.key_for(lager) != basis
+
+    cache = SolutionCache()
+    solve_cached(_gitter(), cache)
+    solve_cached(steifer, cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_lru_eviction_by_bytes():
+    u = np.zeros(10)
+    energien = {i: 0.0 for i in range(5)}
+    groesse = u.nbytes + 5 * 8
+
+    cache = SolutionCache(max_bytes=2 * groesse)
+    cache.put("a", u, energien)
+    cache.put("b", u, energien)
+    assert cache.get("a") is not None  # "a" ist jetzt zuletzt benutzt
+
+    cache.put("c", u, energien)
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.current_bytes == 2 * groesse
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    # Zu große Einträge werden nicht aufgenommen und verdrängen nichts
+    cache.put("gross", np.zeros(100), energien)
+    assert len(cache) == 2 and cache.evictions == 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.current_bytes == 0
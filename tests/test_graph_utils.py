@@ -0,0 +1,92 @@
+import random
+
+from src.model.structure import Structure
+from src.analysis.graph_utils import check_connectivity, label_components, remove_islands
+
+
+def _zufaelliges_gitter(rng):
+    width, height = rng.randint(1, 12), rng.randint(1, 8)
+    struct = Structure.create_grid(width, height)
+    for _ in range(rng.randint(0, 2)):
+        struct.last_aufbringen(rng.randrange(width * height), 0.0, 1.0)
+
+    anteil = rng.random()
+    for node in struct.nodes:
+        if rng.random() < anteil:
+            node.active = False
+    return struct
+
+
+def _bfs_komponenten(struct):
+    """Referenz: Komponenten des aktiven Teilgraphen per Breitensuche, als Mengen von IDs."""
+    adj = {n.id: [] for n in struct.nodes if n.active}
+    for el in struct.elements:
+        if el.node_a.active and el.node_b.active:
+            adj[el.node_a.id].append(el.node_b.id)
+            adj[el.node_b.id].append(el.node_a.id)
+
+    komponenten = []
+    besucht = set()
+    for start in adj:
+        if start in besucht:
+            continue
+        komponente = {start}
+        queue = [start]
+        while queue:
+            curr = queue.pop()
+            for nachbar in adj[curr]:
+                if nachbar not in komponente:
+                    komponente.add(nachbar)
+                    queue.append(nachbar)
+        besucht |= komponente
+        komponenten.append(frozenset(komponente))
+    return set(komponenten)
+
+
+def _label_komponenten(labels):
+    gruppen = {}
+    for nid, label in enumerate(labels):
+        if label >= 0:
+            gruppen.setdefault(label, set()).add(nid)
+    return {frozenset(g) for g in gruppen.values()}
+
+
+def test_labels_match_bfs():
+    rng = random.Random(0)
+    for _ in range(500):
+        struct = _zufaelliges_gitter(rng)
+        labels, hat_lager, hat_last = label_components(struct)
+
+        assert _label_komponenten(labels) == _bfs_komponenten(struct)
+        for nid, node in enumerate(struct.nodes):
+            assert (labels[nid] == -1) == (not node.active)
+
+        for komp in range(len(hat_lager)):
+            ids = [nid for nid, label in enumerate(labels) if label == komp]
+            assert hat_lager[komp] == any(any(struct.nodes[nid].fixed) for nid in ids)
+            assert hat_last[komp] == any(nid in struct.forces for nid in ids)
+
+
+def test_check_connectivity_matches_check_stability():
+    rng = random.Random(1)
+    for _ in range(500):
+        struct = _zufaelliges_gitter(rng)
+        assert check_connectivity(struct) == struct.check_stability()
+
+
+def test_remove_islands_only_removes_unsupported_unloaded_components():
+    rng = random.Random(2)
+    for _ in range(500):
+        struct = _zufaelliges_gitter(rng)
+        vorher = _bfs_komponenten(struct)
+
+        entfernt = set(remove_islands(struct))
+
+        erwartet = set()
+        for komp in vorher:
+            if not any(any(struct.nodes[nid].fixed) for nid in komp) and \
+                    not any(nid in struct.forces for nid in komp):
+                erwartet |= komp
+        assert entfernt == erwartet
+        assert all(not struct.nodes[nid].active for nid in entfernt)
+        assert _bfs_komponenten(struct) == {k for k in vorher if not k & erwartet}
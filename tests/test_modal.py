@@ -0,0 +1,62 @@
+import numpy as np
+import scipy.linalg as sl
+
+from src.model.structure import Structure
+from src.analysis.modal import FrequencyTracker, modal_analysis
+
+
+def _dichte_frequenzen(struct):
+    frei = struct.hole_freie_dofs()
+    K = struct.erstelle_globale_steifigkeitsmatrix()[np.ix_(frei, frei)]
+    M = np.diag(struct.erstelle_massenmatrix().diagonal()[frei])
+    eigenwerte = sl.eigh(K, M, eigvals_only=True)
+    return np.sqrt(np.clip(eigenwerte, 0.0, None)) / (2.0 * np.pi)
+
+
+def _rahmen_mit_mechanismus():
+    """Ausgesteifter Rahmen mit einem Pendelstab (5-6): Knoten 6 kann quer frei schwingen."""
+    struct = Structure()
+    struct.knoten_hinzufuegen(0.0, 1.0, [True, True])
+    struct.knoten_hinzufuegen(1.0, 1.0, [True, True])
+    struct.knoten_hinzufuegen(2.0, 1.0, [True, True])
+    struct.knoten_hinzufuegen(0.0, 0.0)
+    struct.knoten_hinzufuegen(1.0, 0.0)
+    struct.knoten_hinzufuegen(2.0, 0.0)
+    struct.knoten_hinzufuegen(2.0, -1.0)
+    for a, b in [(0, 3), (1, 4), (2, 5), (3, 4), (4, 5), (0, 4), (1, 3), (5, 6)]:
+        struct.element_hinzufuegen(a, b)
+    return struct
+
+
+def test_matches_dense_reference_without_mechanism():
+    struct = Structure.create_grid(9, 4)
+    frequenzen, moden, n_mech = modal_analysis(struct, k=3)
+
+    assert n_mech == 0
+    np.testing.assert_allclose(frequenzen, _dichte_frequenzen(struct)[:3], rtol=1e-6)
+    assert moden.shape == (len(struct.nodes) * 2, 3)
+
+
+def test_mechanism_modes_are_counted_not_reported():
+    struct = _rahmen_mit_mechanismus()
+    referenz = _dichte_frequenzen(struct)
+    n_null = int(np.sum(referenz < 1e-6))
+    assert n_null >= 1
+
+    frequenzen, _, n_mech = modal_analysis(struct, k=2)
+
+    assert n_mech == n_null
+    assert np.all(frequenzen > 0)
+    np.testing.assert_allclose(frequenzen, referenz[n_null:n_null + 2], rtol=1e-6)
+
+
+def test_tracker_reports_first_elastic_frequency():
+    struct = _rahmen_mit_mechanismus()
+    tracker = FrequencyTracker()
+
+    f1 = tracker.update(struct)
+    assert f1 > 0
+    assert tracker.mechanisms == [int(np.sum(_dichte_frequenzen(struct) < 1e-6))]
+
+    # Zu wenige freie DOFs -> nan statt Abbruch
+    assert np.isnan(tracker.update(Structure.create_grid(2, 1)))
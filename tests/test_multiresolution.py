@@ -0,0 +1,26 @@
+import contextlib
+import io
+
+from src.model.structure import Structure
+from src.analysis.cache import SolutionCache, solve_cached
+from src.analysis.optimizer import run_optimization, run_multiresolution_optimization
+
+
+def _optimieren(funktion):
+    struct = Structure.create_grid(21, 9)
+    struct.last_aufbringen(10, 0, 1000)
+    iterationen = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        funktion(struct, 0.5, 0.02, callback=iterationen.append)
+    _, energien = solve_cached(struct, SolutionCache())
+    return sum(energien.values()), len(iterationen), struct
+
+
+def test_multiresolution_compliance_comparable_to_fixed_rate():
+    c_fest, solves_fest, _ = _optimieren(run_optimization)
+    c_multi, solves_fein, struct = _optimieren(run_multiresolution_optimization)
+
+    assert struct.check_stability()
+    # Callback läuft nur auf dem feinen Gitter -> Anzahl der Fein-Lösungen
+    assert solves_fein < solves_fest
+    assert c_multi <= 1.1 * c_fest
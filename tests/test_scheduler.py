@@ -0,0 +1,84 @@
+import contextlib
+import io
+
+import numpy as np
+
+from src.model.structure import Structure
+from src.analysis.optimizer import run_optimization
+from src.analysis.scheduler import RemovalRateScheduler
+
+
+def test_scheduler_starts_at_removal_rate():
+    scheduler = RemovalRateScheduler()
+    struct = Structure.create_grid(9, 4)
+    struct.last_aufbringen(4, 0, 1000)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_optimization(struct, 0.8, 0.03, scheduler=scheduler)
+    assert scheduler.history[0][1] == 0.03
+
+
+class _SprungImDrittenSchritt(RemovalRateScheduler):
+    """Meldet im dritten Schritt einen Compliance-Sprung, sonst nie."""
+
+    def observe(self, compliance):
+        if len(self.history) == 2:
+            self.history.append((compliance, self.rate))
+            self._verkleinern()
+            self.backtracks += 1
+            return True
+        return super().observe(compliance)
+
+
+class _HalbeRateImZweitenSchritt(RemovalRateScheduler):
+    """Referenz ohne Backtracking: entfernt im zweiten Schritt direkt mit halber Rate."""
+
+    def observe(self, compliance):
+        if len(self.history) == 1:
+            self._verkleinern()
+        return super().observe(compliance)
+
+
+def test_backtracking_restores_state_and_shrinks_rate():
+    struct = Structure.create_grid(21, 6)
+    struct.last_aufbringen(10, 0, 1000)
+
+    # Sprung erst im dritten Schritt, damit die Momentum-Historie schon zwei Lösungen enthält
+    scheduler = _SprungImDrittenSchritt(initial_rate=0.1, min_rate=0.01, shrink=0.5, grow=1.0,
+                                        high_change=1e9)
+
+    # Jeder Aufruf von speichere_verschiebungen (Solve oder Backtracking) protokolliert den Zustand
+    protokoll = []
+    original = struct.speichere_verschiebungen
+
+    def speichern(u):
+        protokoll.append((struct.hole_aktiv_maske(), np.array(u)))
+        original(u)
+
+    struct.speichere_verschiebungen = speichern
+
+    infos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_optimization(struct, 0.5, 0.1, scheduler=scheduler, callback=infos.append)
+
+    assert scheduler.backtracks == 1
+    assert scheduler.rate == 0.05
+
+    (_, _), (maske_2, u_2), (maske_3, _), (maske_zurueck, u_zurueck), (maske_4, _) = protokoll[:5]
+
+    # Zurückgesetzt wird exakt auf Topologie und Lösung vor dem verworfenen Schritt
+    np.testing.assert_array_equal(maske_zurueck, maske_2)
+    np.testing.assert_array_equal(u_zurueck, u_2)
+    assert infos[2]['compliance'] == infos[1]['compliance']
+    assert infos[2]['rate'] == 0.05
+
+    # Verworfen wird der Löschschritt der zweiten Iteration. Da Energien und Momentum-Historie
+    # mit zurückgesetzt werden, muss der weitere Verlauf exakt einem Lauf gleichen, der schon
+    # in der zweiten Iteration mit der halben Rate entfernt hätte
+    referenz = Structure.create_grid(21, 6)
+    referenz.last_aufbringen(10, 0, 1000)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_optimization(referenz, 0.5, 0.1, scheduler=_HalbeRateImZweitenSchritt(
+            initial_rate=0.1, min_rate=0.01, shrink=0.5, grow=1.0, high_change=1e9))
+
+    np.testing.assert_array_equal(struct.hole_aktiv_maske(), referenz.hole_aktiv_maske())
+    assert not np.array_equal(maske_4, maske_3)
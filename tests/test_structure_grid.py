@@ -0,0 +1,51 @@
+import copy
+import random
+
+from src.model.structure import Structure
+
+
+def _zufaelliges_gitter(rng):
+    width, height = rng.randint(1, 14), rng.randint(1, 9)
+    struct = Structure.create_grid(width, height)
+    if rng.random() < 0.5:
+        struct.last_aufbringen(rng.randrange(width * height), 0.0, 1.0)
+
+    anteil = rng.random()
+    for node in struct.nodes:
+        if rng.random() < anteil:
+            node.active = False
+    return struct
+
+
+def _generisch(struct):
+    """Kopie, die den Gitter-Fast-Path umgeht und die Element-Schleifen benutzt."""
+    kopie = copy.deepcopy(struct)
+    kopie._ist_gitter = lambda: False
+    return kopie
+
+
+def _aktiv(struct):
+    return [n.active for n in struct.nodes]
+
+
+def test_grid_fast_path_matches_generic_loops():
+    rng = random.Random(0)
+    for _ in range(300):
+        schnell = _zufaelliges_gitter(rng)
+        langsam = _generisch(schnell)
+        assert schnell._ist_gitter()
+
+        schnell.fuelle_loecher()
+        langsam.fuelle_loecher()
+        assert _aktiv(schnell) == _aktiv(langsam)
+
+        schnell.entferne_tote_aeste()
+        langsam.entferne_tote_aeste()
+        assert _aktiv(schnell) == _aktiv(langsam)
+
+
+def test_grid_detection_falls_back_after_extra_element():
+    struct = Structure.create_grid(5, 4)
+    assert struct._ist_gitter()
+    struct.element_hinzufuegen(0, 19)
+    assert not struct._ist_gitter()